@@ -1,63 +1,382 @@
+import bisect
 import csv
+import datetime
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 #to install fitparse, run 
 #sudo pip3 install -e git+https://github.com/dtcooper/python-fitparse#egg=python-fitparse
 import fitparse
 import pytz
+try:
+    #only needed for parquet/feather output
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
 allowed_fields = ['timestamp','position_lat','position_long', 'distance',
 'enhanced_altitude', 'altitude','enhanced_speed',
                  'speed', 'heart_rate','cadence','fractional_cadence']
 required_fields = ['timestamp', 'position_lat', 'position_long', 'altitude']
+allowed_field_set = set(allowed_fields)
 
-UTC = pytz.UTC
-CST = pytz.timezone('US/Central')
+#fitparse.FitFile keeps every parsed message of every type for the life of
+#the file, so reading a long activity grows with its length. git master has
+#an uncached reader; on 1.2.0 drop each message from the cache once parsed
+if hasattr(fitparse, 'UncachedFitFile'):
+    StreamingFitFile = fitparse.UncachedFitFile
+else:
+    class StreamingFitFile(fitparse.FitFile):
+        def _parse_message(self):
+            message = super()._parse_message()
+            self._messages.clear()
+            return message
 
+# seconds from the unix epoch to the fit epoch (1989-12-31 00:00 UTC)
+FIT_EPOCH = 631065600
 
-def main():
+# timezone of the timestamps written to the output files
+TIMEZONE = 'US/Central'
+
+# output format: 'csv', or 'parquet' / 'feather' for typed columnar files
+OUTPUT_FORMAT = 'csv'
+output_extensions = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+
+# records converted and written together
+BATCH_ROWS = 65536
+
+# output buffer for the csv writer, in bytes
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# number of conversion processes; 1 converts in this process
+WORKERS = os.cpu_count() or 1
+
+# converted files, keyed by .fit file name, with the size/mtime/hash they had
+MANIFEST_FILE = 'fit_manifest.json'
+
+# save the manifest after this many converted files or seconds, and at the end
+MANIFEST_SAVE_FILES = 100
+MANIFEST_SAVE_SECONDS = 30
+
+
+def main(workers=WORKERS, output_format=OUTPUT_FORMAT, timezone=TIMEZONE):
     files = os.listdir()
     fit_files = [file for file in files if file[-4:].lower()=='.fit']
+    manifest = load_manifest()
+    pending = plan_conversions(fit_files, manifest, output_format, timezone)
+    save_manifest(manifest)
+
+    #the manifest is saved every few files and again on the way out, so an
+    #interrupted run keeps most of what it finished
+    unsaved = 0
+    last_save = time.perf_counter()
+
+    def record(result):
+        nonlocal unsaved, last_save
+        file, rows, _, error = result
+        if not error:
+            manifest[file] = dict(pending[file], output=output_name(file, output_format),
+                                  timezone=timezone, rows=rows)
+            unsaved += 1
+            if (unsaved >= MANIFEST_SAVE_FILES
+                    or time.perf_counter() - last_save >= MANIFEST_SAVE_SECONDS):
+                save_manifest(manifest)
+                unsaved = 0
+                last_save = time.perf_counter()
+        results.append(result)
+        report_progress(result, len(results), len(pending))
+
+    start = time.perf_counter()
+    results = []
+    try:
+        if workers <= 1:
+            for file in pending:
+                record(convert_file(file, output_format, timezone))
+        else:
+            #one file per worker is in flight, so an interrupt waits for the
+            #conversions already running rather than the whole backlog
+            files = iter(pending)
+            executor = ProcessPoolExecutor(max_workers=workers)
+            running = set()
+            try:
+                for file in islice(files, workers):
+                    running.add(executor.submit(convert_file, file, output_format, timezone))
+                while running:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for file in islice(files, 1):
+                            running.add(executor.submit(convert_file, file, output_format, timezone))
+                        record(future.result())
+            finally:
+                executor.shutdown(cancel_futures=True)
+                #files that finished while shutting down are kept too
+                for future in running:
+                    if not future.cancelled():
+                        record(future.result())
+    finally:
+        save_manifest(manifest)
+    report_summary(results, time.perf_counter() - start)
+    print('finished conversions')
+
+
+def output_name(file, output_format=OUTPUT_FORMAT):
+    return file[:-4] + output_extensions[output_format]
+
+
+def file_fingerprint(file):
+    """size, mtime and sha-256 content hash of a file"""
+    stat = os.stat(file)
+    sha256 = hashlib.sha256()
+    with open(file, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(block)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': sha256.hexdigest()}
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    try:
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print('could not read %s, converting everything: %s' % (MANIFEST_FILE, e))
+        return {}
+
+
+def save_manifest(manifest):
+    temp_file = MANIFEST_FILE + '.tmp'
+    with open(temp_file, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_file, MANIFEST_FILE)
+
+
+def plan_conversions(fit_files, manifest, output_format=OUTPUT_FORMAT, timezone=TIMEZONE):
+    """return {file: fingerprint} for the files that need converting, and drop
+    manifest entries for files no longer on disk.
+
+    a file is done when its output exists with the same format and timezone
+    and its size and mtime match the manifest; if only the mtime moved, the
+    content hash decides. files missing from the manifest are always
+    converted, since an output left by an interrupted run may be partial."""
+    pending = {}
     for file in fit_files:
-        new_filename = file[:-4] + '.csv'
-        if os.path.exists(new_filename):
-            #print('%s already exists. skipping.' % new_filename)
+        entry = manifest.get(file)
+        if (entry is None or entry.get('output') != output_name(file, output_format)
+                or entry.get('timezone') != timezone
+                or not os.path.exists(entry['output'])):
+            pending[file] = file_fingerprint(file)
+            continue
+        stat = os.stat(file)
+        if entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            continue
+        fingerprint = file_fingerprint(file)
+        if entry['sha256'] == fingerprint['sha256']:
+            #touched but identical, just remember the new mtime
+            entry.update(fingerprint)
             continue
-        fitfile = fitparse.FitFile(file,  
+        pending[file] = fingerprint
+
+    on_disk = set(fit_files)
+    for file in [file for file in manifest if file not in on_disk]:
+        del manifest[file]
+    return pending
+
+
+def convert_file(file, output_format=OUTPUT_FORMAT, timezone=TIMEZONE):
+    """convert one .fit file; errors are returned rather than raised so one
+    bad file does not stop the batch. returns (file, rows, seconds, error)
+
+    output is written to a temporary file and renamed into place, so an
+    interrupted conversion never leaves a partial file under the real name"""
+    start = time.perf_counter()
+    output_file = output_name(file, output_format)
+    temp_file = '%s.%d.tmp' % (output_file, os.getpid())
+    try:
+        fitfile = StreamingFitFile(file,
             data_processor=fitparse.StandardUnitsDataProcessor())
-        
-        print('converting %s' % file)
-        write_fitfile_to_csv(fitfile, new_filename)
-    print('finished conversions')
+        if output_format == 'csv':
+            rows = write_fitfile_to_csv(fitfile, temp_file, timezone)
+        else:
+            rows = write_fitfile_to_arrow(fitfile, temp_file, output_format, timezone)
+        os.replace(temp_file, output_file)
+        print('wrote %s' % output_file)
+        return file, rows, time.perf_counter() - start, None
+    except Exception as e:
+        return file, 0, time.perf_counter() - start, '%s: %s' % (type(e).__name__, e)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
 
 
-def write_fitfile_to_csv(fitfile, output_file='test_output.csv'):
-    messages = fitfile.messages
-    data = []
-    for m in messages:
-        skip=False
-        if not hasattr(m, 'fields'):
-            continue
-        fields = m.fields
-        #check for important data types
+def report_progress(result, done, total):
+    file, rows, seconds, error = result
+    if error:
+        print('[%d/%d] failed %s: %s' % (done, total, file, error))
+    else:
+        print('[%d/%d] converted %s (%d rows, %.1fs)' % (done, total, file, rows, seconds))
+
+
+def report_summary(results, elapsed):
+    converted = [r for r in results if not r[3]]
+    failed = [r for r in results if r[3]]
+    rows = sum(r[1] for r in converted)
+    print('converted %d file(s), %d failed, %d rows in %.1fs' % (len(converted), len(failed), rows, elapsed))
+    if elapsed > 0 and results:
+        print('%.2f files/sec, %.0f rows/sec' % (len(results) / elapsed, rows / elapsed))
+    for file, _, _, error in failed:
+        print('  %s: %s' % (file, error))
+
+
+def iter_records(fitfile):
+    """lazily yield a dict of the allowed fields of each record message,
+    skipping records that are missing a required field"""
+    for m in fitfile.get_messages('record'):
         mdata = {}
-        for field in fields:
-            if field.name in allowed_fields:
+        for field in m.fields:
+            if field.name in allowed_field_set:
                 if field.name=='timestamp':
-                    mdata[field.name] = UTC.localize(field.value).astimezone(CST)
+                    #unix seconds; converting to local time is done a batch at a time.
+                    #a record without a real date is skipped like one missing it
+                    timestamp = epoch_seconds(field)
+                    if timestamp is not None:
+                        mdata[field.name] = timestamp
                 else:
                     mdata[field.name] = field.value
-        for rf in required_fields:
-            if rf not in mdata:
-                skip=True
-        if not skip:
-            data.append(mdata)
-    #write to csv
-    with open(output_file, 'w') as f:
+        if all(rf in mdata for rf in required_fields):
+            yield mdata
+
+
+def iter_batches(fitfile, size=BATCH_ROWS):
+    """group iter_records into lists of up to size records"""
+    batch = []
+    for entry in iter_records(fitfile):
+        batch.append(entry)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def epoch_seconds(field):
+    """unix seconds of a timestamp field from its raw fit value, or None when
+    the value is invalid or relative (below 0x10000000 it counts seconds
+    since the device powered on, not a date)"""
+    raw = field.raw_value
+    if raw is None or raw < 0x10000000:
+        return None
+    return raw + FIT_EPOCH
+
+
+def utc_offset(tz, epoch):
+    return int(datetime.datetime.fromtimestamp(epoch, tz).utcoffset().total_seconds())
+
+
+def offset_segments(tz, first, last):
+    """[(start, utc offset)] covering unix seconds first..last. the span is
+    probed once a day and each dst transition is found by bisection, so the
+    timezone is consulted a handful of times per transition, not per record"""
+    offset = utc_offset(tz, first)
+    segments = [(first, offset)]
+    lo = first
+    while lo < last:
+        hi = min(lo + 86400, last)
+        if utc_offset(tz, hi) != offset:
+            a, b = lo, hi
+            while b - a > 1:
+                mid = (a + b) // 2
+                if utc_offset(tz, mid) == offset:
+                    a = mid
+                else:
+                    b = mid
+            offset = utc_offset(tz, b)
+            segments.append((b, offset))
+        lo = hi
+    return segments
+
+
+def format_offset(offset):
+    sign = '-' if offset < 0 else '+'
+    hours, minutes = divmod(abs(offset) // 60, 60)
+    return '%s%02d:%02d' % (sign, hours, minutes)
+
+
+def format_timestamps(epochs, timezone=TIMEZONE):
+    """format unix seconds as local times in the same form as str() of an
+    aware datetime, e.g. 2020-06-01 07:30:00-05:00"""
+    if not epochs:
+        return []
+    segments = offset_segments(pytz.timezone(timezone), min(epochs), max(epochs))
+    starts = [start for start, _ in segments]
+    offsets = [offset for _, offset in segments]
+    suffixes = [format_offset(offset) for offset in offsets]
+    dates = {}
+    formatted = []
+    for epoch in epochs:
+        i = bisect.bisect_right(starts, epoch) - 1
+        day, seconds = divmod(epoch + offsets[i], 86400)
+        date = dates.get(day)
+        if date is None:
+            date = dates[day] = time.strftime('%Y-%m-%d', time.gmtime(day * 86400))
+        hours, seconds = divmod(seconds, 3600)
+        minutes, seconds = divmod(seconds, 60)
+        formatted.append('%s %02d:%02d:%02d%s' % (date, hours, minutes, seconds, suffixes[i]))
+    return formatted
+
+
+def write_fitfile_to_csv(fitfile, output_file='test_output.csv', timezone=TIMEZONE):
+    #rows are written a batch at a time as records are parsed, so memory use
+    #does not grow with the length of the activity
+    rows = 0
+    with open(output_file, 'w', newline='', buffering=WRITE_BUFFER_SIZE) as f:
         writer = csv.writer(f)
         writer.writerow(allowed_fields)
-        for entry in data:
-            writer.writerow([ str(entry.get(k, '')) for k in allowed_fields])
-    print('wrote %s' % output_file)
+        for batch in iter_batches(fitfile):
+            timestamps = format_timestamps([entry['timestamp'] for entry in batch], timezone)
+            for entry, timestamp in zip(batch, timestamps):
+                entry['timestamp'] = timestamp
+                writer.writerow([ str(entry.get(k, '')) for k in allowed_fields])
+            rows += len(batch)
+    return rows
+
+
+def arrow_schema(timezone=TIMEZONE):
+    """typed arrow columns for allowed_fields"""
+    types = {
+        #stored as utc seconds, the timezone is column metadata
+        'timestamp': pa.timestamp('s', tz=timezone),
+        'heart_rate': pa.int16(),
+        'cadence': pa.int16(),
+    }
+    return pa.schema([(k, types.get(k, pa.float64())) for k in allowed_fields])
+
+
+def write_fitfile_to_arrow(fitfile, output_file, output_format='parquet', timezone=TIMEZONE):
+    """write records to a parquet or feather (arrow ipc) file with typed
+    columns, one record batch every BATCH_ROWS rows"""
+    if pa is None:
+        raise ImportError('%s output requires pyarrow' % output_format)
+    schema = arrow_schema(timezone)
+    if output_format == 'parquet':
+        writer = pq.ParquetWriter(output_file, schema)
+    else:
+        writer = pa.ipc.new_file(output_file, schema)
+    rows = 0
+    try:
+        for batch in iter_batches(fitfile):
+            arrays = [pa.array([entry.get(k) for entry in batch], type=schema.field(k).type)
+                      for k in allowed_fields]
+            writer.write_table(pa.Table.from_batches([pa.record_batch(arrays, schema=schema)]))
+            rows += len(batch)
+    finally:
+        writer.close()
+    return rows
+
 
 if __name__=='__main__':
     main()
\ No newline at end of file
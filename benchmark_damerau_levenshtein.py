@@ -0,0 +1,165 @@
+"""
+Benchmark the Damerau-Levenshtein implementations.
+
+Every variant is first checked against reference_damerau_levenshtein_distance
+on the workload, then timed (best of REPEATS) and reported as nanoseconds per
+DP cell and pairs per second. Inputs come from a fixed seed, so runs are
+comparable across machines and commits.
+
+    python benchmark_damerau_levenshtein.py
+"""
+import random
+import string
+import time
+
+from damerau_levenshtein_distance import (
+    DistanceCache,
+    SourceDistance,
+    damerau_levenshtein_distance,
+    iter_distances,
+    np,
+    pairwise_distances,
+    reference_damerau_levenshtein_distance,
+)
+
+SEED = 2024
+REPEATS = 3
+BOUND = 2
+NAME_ALPHABET = string.ascii_letters + ' '
+
+# (label, pairs, string length, similar)
+PAIR_WORKLOADS = [
+    ('short names, similar', 500, 12, True),
+    ('short names, dissimilar', 500, 12, False),
+    ('long strings, similar', 10, 300, True),
+    ('long strings, dissimilar', 10, 300, False),
+]
+
+# Names per side for the batch (N x N) comparisons
+BATCH_SIZES = [10, 50, 100]
+
+
+def random_string(rng, length):
+    return ''.join(rng.choice(NAME_ALPHABET) for _ in range(length))
+
+
+def mutate(rng, s, edits):
+    """Apply random insertions, deletions, substitutions and transpositions"""
+    chars = list(s)
+    for _ in range(edits):
+        op = rng.choice('idst')
+        pos = rng.randrange(max(len(chars), 1))
+        if op == 'i':
+            chars.insert(pos, rng.choice(NAME_ALPHABET))
+        elif op == 'd' and chars:
+            del chars[pos]
+        elif op == 's' and chars:
+            chars[pos] = rng.choice(NAME_ALPHABET)
+        elif op == 't' and pos + 1 < len(chars):
+            chars[pos], chars[pos + 1] = chars[pos + 1], chars[pos]
+    return ''.join(chars)
+
+
+def make_pairs(rng, count, length, similar):
+    pairs = []
+    for _ in range(count):
+        a = random_string(rng, length)
+        b = mutate(rng, a, rng.randint(1, 2)) if similar else random_string(rng, length)
+        pairs.append((a, b))
+    return pairs
+
+
+def best_time(func):
+    """Best wall-clock time of REPEATS calls"""
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(label, elapsed, cells, pairs):
+    ns_per_cell = elapsed / cells * 1e9 if cells else 0.0
+    pairs_per_sec = pairs / elapsed if elapsed else float('inf')
+    print(f"  {label:<24} {ns_per_cell:>10.1f} ns/cell {pairs_per_sec:>14,.0f} pairs/sec")
+
+
+def check(label, got, expected):
+    if got != expected:
+        raise AssertionError(f"{label} disagrees with the reference implementation")
+
+
+def bench_pairs(rng):
+    """Single-pair variants on each workload"""
+    variants = [
+        ('reference', lambda pairs: [reference_damerau_levenshtein_distance(a, b) for a, b in pairs]),
+        ('array', lambda pairs: [damerau_levenshtein_distance(a, b) for a, b in pairs]),
+        (f'bounded k={BOUND}', lambda pairs: [damerau_levenshtein_distance(a, b, BOUND) for a, b in pairs]),
+    ]
+
+    for label, count, length, similar in PAIR_WORKLOADS:
+        pairs = make_pairs(rng, count, length, similar)
+        cells = sum(len(a) * len(b) for a, b in pairs)
+        expected = [reference_damerau_levenshtein_distance(a, b) for a, b in pairs]
+        # Lookups on a warm cache, with the pairs given in reversed order
+        cache = DistanceCache()
+        for a, b in pairs:
+            cache.distance(a, b)
+        cached = ('cached (warm, swapped)', lambda pairs: [cache.distance(b, a) for a, b in pairs])
+
+        print(f"\n{label} ({count} pairs, length {length})")
+        for name, run in variants + [cached]:
+            want = [min(d, BOUND + 1) for d in expected] if name.startswith('bounded') else expected
+            check(name, run(pairs), want)
+            report(name, best_time(lambda: run(pairs)), cells, len(pairs))
+
+
+def bench_batches(rng):
+    """N x N batch variants over lists of names"""
+    for size in BATCH_SIZES:
+        names_a = [random_string(rng, rng.randint(6, 20)) for _ in range(size)]
+        names_b = [mutate(rng, name, 1) for name in names_a]
+        cells = sum(len(a) for a in names_a) * sum(len(b) for b in names_b)
+        pairs = size * size
+        expected = [[reference_damerau_levenshtein_distance(a, b) for b in names_b] for a in names_a]
+
+        def loop():
+            return [[damerau_levenshtein_distance(a, b) for b in names_b] for a in names_a]
+
+        def source():
+            # One matcher per column string, fed the row strings in sorted order
+            order = sorted(range(size), key=names_a.__getitem__)
+            result = [[0] * size for _ in range(size)]
+            for j, b in enumerate(names_b):
+                matcher = SourceDistance(b)
+                for i in order:
+                    result[i][j] = matcher.distance(names_a[i])
+            return result
+
+        def pool():
+            result = [[0] * size for _ in range(size)]
+            for i, j, d in iter_distances(names_a, names_b, workers=2):
+                result[i][j] = d
+            return result
+
+        variants = [('array loop', loop), ('source prefix reuse', source), ('process pool (2)', pool)]
+        if np is not None:
+            variants.append(('pairwise_distances', lambda: pairwise_distances(names_a, names_b).tolist()))
+
+        print(f"\nbatch {size} x {size}")
+        for name, run in variants:
+            check(name, run(), expected)
+            report(name, best_time(run), cells, pairs)
+
+
+def main():
+    rng = random.Random(SEED)
+    print(f"Damerau-Levenshtein benchmark (seed {SEED}, best of {REPEATS})")
+    bench_pairs(rng)
+    bench_batches(rng)
+
+
+if __name__ == "__main__":
+    main()
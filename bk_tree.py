@@ -0,0 +1,123 @@
+import json
+
+from damerau_levenshtein_distance import damerau_levenshtein_distance
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree for finding near matches by edit distance.
+
+    Each node holds a word and its children keyed by their distance to that
+    word. Because Damerau-Levenshtein is a metric, a query within distance k
+    of a node at distance d only has to visit children keyed d - k .. d + k,
+    so most of the dictionary is never compared against the query.
+    """
+
+    def __init__(self, words=(), distance=damerau_levenshtein_distance):
+        """
+        Build a tree over words.
+
+        Args:
+            words: Iterable of strings to index
+            distance: Metric used to compare strings
+        """
+        self.distance = distance
+        self.root = None      # [word, {distance: child node}, entry index]
+        self.entries = []     # (word, parent entry index, distance) in insertion order
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _attach(self, word, parent, parent_index, d):
+        node = [word, {}]
+        if parent is None:
+            self.root = node
+        else:
+            parent[1][d] = node
+        node.append(len(self.entries))
+        self.entries.append((word, parent_index, d))
+        return node
+
+    def add(self, word):
+        """
+        Add a word to the tree.
+
+        Returns:
+            bool: False if the word was already indexed
+        """
+        if self.root is None:
+            self._attach(word, None, -1, 0)
+            return True
+        node = self.root
+        while True:
+            d = self.distance(word, node[0])
+            if d == 0:
+                return False
+            child = node[1].get(d)
+            if child is None:
+                self._attach(word, node, node[2], d)
+                return True
+            node = child
+
+    def query(self, term, k):
+        """
+        Find every indexed word within distance k of term.
+
+        Args:
+            term: String to look up
+            k: Maximum distance
+
+        Returns:
+            list: (distance, word) pairs, closest first
+        """
+        matches = []
+        if self.root is None:
+            return matches
+        stack = [self.root]
+        while stack:
+            word, children, _ = stack.pop()
+            d = self.distance(term, word)
+            if d <= k:
+                matches.append((d, word))
+            for child_d, child in children.items():
+                if d - k <= child_d <= d + k:
+                    stack.append(child)
+        matches.sort()
+        return matches
+
+    def save(self, path):
+        """Write the tree to a JSON file, keeping its shape so loading needs no distance calls"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+
+    @classmethod
+    def load(cls, path, distance=damerau_levenshtein_distance):
+        """Read a tree written by save()"""
+        tree = cls(distance=distance)
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+        nodes = []
+        for word, parent_index, d in entries:
+            parent = nodes[parent_index] if parent_index >= 0 else None
+            nodes.append(tree._attach(word, parent, parent_index, d))
+        return tree
+
+
+# Example usage
+if __name__ == "__main__":
+    import csv
+    import glob
+
+    # Index the coach names from the per-coach CSVs
+    names = set()
+    for csv_file in glob.glob('nfl/rawdata/*.csv'):
+        with open(csv_file, newline='', encoding='utf-8') as f:
+            names.update(row['coach'] for row in csv.DictReader(f))
+
+    tree = BKTree(sorted(names))
+    print(f"Indexed {len(tree)} coach names")
+
+    for term in ["Mike McCarty", "Bill Parcels", "Jon Harbaugh", "Vince Lombardi"]:
+        print(f'"{term}": {tree.query(term, 2)}')
@@ -1,7 +1,22 @@
-def damerau_levenshtein_distance(s1, s2):
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for pairwise_distances
+    np = None
+
+
+def reference_damerau_levenshtein_distance(s1, s2):
     """
     Calculate the Damerau-Levenshtein distance between two strings.
     
+    This is the original dictionary-backed implementation, kept as the
+    reference that faster variants are checked against.
+    
     This metric measures the minimum number of operations needed to transform
     one string into another, where operations include:
     - Insertion of a character
@@ -55,6 +70,341 @@ def damerau_levenshtein_distance(s1, s2):
     return H[len1, len2]
 
 
+def encode_strings(strings, alphabet=None):
+    """
+    Map each string to a list of small integer character codes.
+    
+    Args:
+        strings: Iterable of strings
+        alphabet: Optional dict of character -> code, extended in place
+    
+    Returns:
+        tuple: (list of code lists, alphabet dict)
+    """
+    if alphabet is None:
+        alphabet = {}
+    encoded = [[alphabet.setdefault(ch, len(alphabet)) for ch in s] for s in strings]
+    return encoded, alphabet
+
+
+def distance_from_codes(a, b, alphabet_size, max_distance=None):
+    """
+    Damerau-Levenshtein distance between two integer-encoded strings.
+    
+    The DP matrix is a flat, preallocated list indexed by row offset rather
+    than a dict keyed by (i, j) tuples, and the last-seen row of each
+    character is a list indexed by character code.
+    
+    With max_distance set, only the diagonal band |i - j| <= max_distance is
+    filled (cells outside it always exceed the bound), and the DP stops as
+    soon as every cell in a row exceeds the bound, since no later cell can
+    be smaller than the minimum of an earlier row.
+    
+    Args:
+        a: First string as a list of codes
+        b: Second string as a list of codes
+        alphabet_size: Number of distinct codes (all codes are below this)
+        max_distance: Optional bound on the distance of interest
+    
+    Returns:
+        int: The Damerau-Levenshtein distance, or max_distance + 1 if the
+        distance is greater than max_distance
+    """
+    len1, len2 = len(a), len(b)
+    if max_distance is None:
+        band = max(len1, len2)
+    elif abs(len1 - len2) > max_distance:
+        return max_distance + 1
+    else:
+        band = max_distance
+    if not len1:
+        return len2
+    if not len2:
+        return len1
+    
+    # Row x of the original H[x, y] (x, y >= -1) starts at (x + 1) * width
+    max_dist = len1 + len2
+    width = len2 + 2
+    H = [max_dist] * ((len1 + 2) * width)
+    H[width + 1:width + 2 + len2] = range(len2 + 1)
+    da = [0] * alphabet_size
+    
+    for i in range(1, len1 + 1):
+        prev = i * width          # Start of row i - 1
+        row = prev + width        # Start of row i
+        H[row + 1] = i
+        row_min = i
+        ai = a[i - 1]
+        db = 0
+        for j in range(max(1, i - band), min(len2, i + band) + 1):
+            bj = b[j - 1]
+            k = da[bj]
+            l = db
+            if ai == bj:
+                best = H[prev + j]                     # match
+                db = j
+            else:
+                best = H[prev + j] + 1                 # substitution
+            cost = H[prev + j + 1] + 1                 # deletion
+            if cost < best:
+                best = cost
+            cost = H[row + j] + 1                      # insertion
+            if cost < best:
+                best = cost
+            cost = H[k * width + l] + (i - k - 1) + 1 + (j - l - 1)  # transposition
+            if cost < best:
+                best = cost
+            H[row + j + 1] = best
+            if best < row_min:
+                row_min = best
+        
+        da[ai] = i
+        if max_distance is not None and row_min > max_distance:
+            return max_distance + 1
+    
+    distance = H[(len1 + 1) * width + len2 + 1]
+    if max_distance is not None and distance > max_distance:
+        return max_distance + 1
+    return distance
+
+
+def damerau_levenshtein_distance(s1, s2, max_distance=None):
+    """
+    Calculate the Damerau-Levenshtein distance between two strings.
+    
+    This metric measures the minimum number of operations needed to transform
+    one string into another, where operations include:
+    - Insertion of a character
+    - Deletion of a character
+    - Substitution of a character
+    - Transposition of two adjacent characters
+    
+    Args:
+        s1: First string
+        s2: Second string
+        max_distance: Optional bound; when the distance exceeds it the
+            search stops early and max_distance + 1 is returned
+    
+    Returns:
+        int: The Damerau-Levenshtein distance, or max_distance + 1 if it
+        is greater than max_distance
+    """
+    (a, b), alphabet = encode_strings((s1, s2))
+    return distance_from_codes(a, b, len(alphabet), max_distance)
+
+
+def pairwise_distances(list_a, list_b, max_distance=None):
+    """
+    Calculate the distance between every string in list_a and every string in list_b.
+    
+    Both lists are integer-encoded once up front against a shared alphabet,
+    so each pair only runs the array-backed DP.
+    
+    Args:
+        list_a: Sequence of strings (rows)
+        list_b: Sequence of strings (columns)
+        max_distance: Optional bound; distances above it are reported as
+            max_distance + 1
+    
+    Returns:
+        numpy.ndarray: len(list_a) x len(list_b) matrix of distances
+    """
+    if np is None:
+        raise ImportError("pairwise_distances requires numpy")
+    
+    encoded_a, alphabet = encode_strings(list_a)
+    encoded_b, alphabet = encode_strings(list_b, alphabet)
+    alphabet_size = len(alphabet)
+    
+    result = np.empty((len(encoded_a), len(encoded_b)), dtype=np.int32)
+    for i, a in enumerate(encoded_a):
+        result[i] = [distance_from_codes(a, b, alphabet_size, max_distance)
+                     for b in encoded_b]
+    return result
+
+
+class DistanceCache:
+    """
+    LRU cache in front of damerau_levenshtein_distance.
+    
+    The distance is symmetric, so pairs are normalised to (smaller, larger)
+    before lookup and ("a", "b") and ("b", "a") share one entry.
+    """
+    
+    def __init__(self, capacity=100000):
+        """
+        Args:
+            capacity: Maximum number of cached pairs (None for unbounded)
+        """
+        self._cached = lru_cache(maxsize=capacity)(damerau_levenshtein_distance)
+    
+    def distance(self, s1, s2, max_distance=None):
+        """Cached damerau_levenshtein_distance(s1, s2, max_distance)"""
+        if s2 < s1:
+            s1, s2 = s2, s1
+        return self._cached(s1, s2, max_distance)
+    
+    def cache_info(self):
+        """Hits, misses, capacity and current size, as functools.lru_cache reports them"""
+        return self._cached.cache_info()
+    
+    def clear(self):
+        """Drop every cached pair and reset the counters"""
+        self._cached.cache_clear()
+
+
+class SourceDistance:
+    """
+    Distances from one fixed source string to many targets, reusing DP rows.
+    
+    The target is laid along the rows of the DP matrix. Row i depends only
+    on the first i characters of the target, so when consecutive targets
+    share a prefix the rows for that prefix are kept and only the rest is
+    recomputed. Iterating targets in sorted order maximises the reuse.
+    """
+    
+    # Stands in for "infinity" in the boundary row and column
+    INF = 1 << 30
+    
+    def __init__(self, source):
+        self.source = source
+        self.alphabet = {}
+        self.codes = [self.alphabet.setdefault(ch, len(self.alphabet)) for ch in source]
+        # rows[x + 1][y + 1] holds H[x, y]; the first two rows are x = -1 and x = 0
+        self.rows = [[self.INF] * (len(source) + 2),
+                     [self.INF] + list(range(len(source) + 1))]
+        self.target = ''
+        self.rows_reused = 0
+        self.rows_computed = 0
+    
+    def distance(self, target):
+        """Damerau-Levenshtein distance from the source to target"""
+        prefix = 0
+        for x, y in zip(self.target, target):
+            if x != y:
+                break
+            prefix += 1
+        del self.rows[prefix + 2:]
+        self.rows_reused += prefix
+        self.rows_computed += len(target) - prefix
+        
+        # Target characters absent from the source never match, so only
+        # source characters need a last-seen row
+        alphabet = self.alphabet
+        b = self.codes
+        rows = self.rows
+        da = [0] * len(alphabet)
+        for i, ch in enumerate(target[:prefix], 1):
+            code = alphabet.get(ch)
+            if code is not None:
+                da[code] = i
+        
+        for i in range(prefix + 1, len(target) + 1):
+            prev = rows[i]
+            row = [self.INF, i]
+            ai = alphabet.get(target[i - 1], -1)
+            db = 0
+            for j in range(1, len(b) + 1):
+                bj = b[j - 1]
+                k = da[bj]
+                l = db
+                if ai == bj:
+                    best = prev[j]
+                    db = j
+                else:
+                    best = prev[j] + 1
+                cost = prev[j + 1] + 1
+                if cost < best:
+                    best = cost
+                cost = row[j] + 1
+                if cost < best:
+                    best = cost
+                cost = rows[k][l] + (i - k - 1) + 1 + (j - l - 1)
+                if cost < best:
+                    best = cost
+                row.append(best)
+            rows.append(row)
+            if ai >= 0:
+                da[ai] = i
+        
+        self.target = target
+        return rows[len(target) + 1][len(b) + 1]
+
+
+# Encoded inputs shared with each worker process by _init_worker
+_worker_rows = None
+_worker_columns = None
+_worker_alphabet_size = 0
+
+
+def _init_worker(rows, columns, alphabet_size):
+    global _worker_rows, _worker_columns, _worker_alphabet_size
+    _worker_rows = rows
+    _worker_columns = columns
+    _worker_alphabet_size = alphabet_size
+
+
+def _distance_chunk(task):
+    """Distances for rows start..stop of the shared inputs, filtered by max_distance"""
+    start, stop, max_distance = task
+    # Without separate columns this is all-pairs, so only j > i is computed
+    columns = _worker_rows if _worker_columns is None else _worker_columns
+    results = []
+    for i in range(start, stop):
+        a = _worker_rows[i]
+        first = i + 1 if _worker_columns is None else 0
+        for j in range(first, len(columns)):
+            d = distance_from_codes(a, columns[j], _worker_alphabet_size, max_distance)
+            if max_distance is None or d <= max_distance:
+                results.append((i, j, d))
+    return results
+
+
+def iter_distances(list_a, list_b=None, max_distance=None, workers=None, chunk_rows=64):
+    """
+    Stream distances between strings, spreading the work over a process pool.
+    
+    With only list_a, every unordered pair within it is compared (i < j);
+    with list_b, every string in list_a is compared with every string in
+    list_b (pass a one-item list_a for one-to-many). Results are yielded
+    chunk by chunk as workers finish, so no N x N matrix is materialised.
+    Only two chunks per worker are queued ahead of the consumer, and the
+    rest are cancelled if it stops early.
+    
+    Args:
+        list_a: Sequence of strings
+        list_b: Optional second sequence of strings
+        max_distance: Optional threshold; only pairs within it are yielded,
+            and the bounded DP is used for every comparison
+        workers: Number of processes (defaults to the CPU count)
+        chunk_rows: Rows of list_a handed to a worker at a time
+    
+    Yields:
+        tuple: (i, j, distance) with i indexing list_a and j indexing
+        list_b (or list_a for all-pairs), ordered by i
+    """
+    rows, alphabet = encode_strings(list_a)
+    columns = None
+    if list_b is not None:
+        columns, alphabet = encode_strings(list_b, alphabet)
+    
+    workers = workers or os.cpu_count() or 1
+    tasks = ((start, min(start + chunk_rows, len(rows)), max_distance)
+             for start in range(0, len(rows), chunk_rows))
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(rows, columns, len(alphabet)))
+    try:
+        pending = deque(executor.submit(_distance_chunk, task) for task in islice(tasks, 2 * workers))
+        while pending:
+            future = pending.popleft()
+            for task in islice(tasks, 1):
+                pending.append(executor.submit(_distance_chunk, task))
+            yield from future.result()
+    finally:
+        # Runs on GeneratorExit too, dropping the chunks no worker has started
+        executor.shutdown(cancel_futures=True)
+
+
 # Example usage
 if __name__ == "__main__":
     # Test cases
@@ -72,4 +422,15 @@ if __name__ == "__main__":
     print("-" * 50)
     for s1, s2 in test_pairs:
         distance = damerau_levenshtein_distance(s1, s2)
-        print(f'"{s1}" → "{s2}": {distance}')
\ No newline at end of file
+        print(f'"{s1}" → "{s2}": {distance}')
+    
+    if np is not None:
+        names = ["Mike McCarthy", "Mike Tomlin", "Bill Parcells"]
+        scraped = ["Mike McCarty", "Mike Tomlin", "Bill Parcels", "Don Shula"]
+        print("\nPairwise distances:")
+        print(pairwise_distances(names, scraped))
+    
+    names = ["Mike McCarthy", "Mike McCarty", "Bill Parcells", "Bill Parcels", "Don Shula"]
+    print("\nNear-duplicate names (distance <= 2):")
+    for i, j, distance in iter_distances(names, max_distance=2, workers=2):
+        print(f'"{names[i]}" ~ "{names[j]}": {distance}')
@@ -1,9 +1,25 @@
 import pandas as pd
-import pyodbc
 import os
-import numpy as np
+import sqlite3
+import hashlib
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    import pyodbc
+except ImportError:  # Only needed for the SQL Server backend
+    pyodbc = None
+
+# Storage backend: 'sqlserver', or 'sqlite' to run without a server
+BACKEND = 'sqlserver'
+
+# SQLite database file used by the sqlite backend
+SQLITE_DATABASE = 'nfl.db'
+
 # SQL Server connection parameters
 SERVER = 'localhost\\SQL2022'  # e.g., 'localhost' or 'server_name\\instance'
 DATABASE = 'nfl'
@@ -13,8 +29,80 @@ PASSWORD = ''  # Optional: leave empty for Windows Authentication
 # Directory containing CSV files
 DATA_DIR = 'rawdata'
 
+# Coach_Staging columns in table order: column -> (dtype, decimal scale, nullable)
+STAGING_SCHEMA = {
+    'coach': ('string', None, False),
+    'Year': ('Int64', None, False),
+    'Age': ('Int64', None, True),
+    'Tm': ('string', None, True),
+    'Lg': ('string', None, True),
+    'G': ('Int64', None, True),
+    'W': ('Int64', None, True),
+    'L': ('Int64', None, True),
+    'T': ('Int64', None, True),
+    'W-L%': ('decimal', 3, True),
+    'SRS': ('decimal', 2, True),
+    'OSRS': ('decimal', 2, True),
+    'DSRS': ('decimal', 2, True),
+    'G_Playoff': ('Int64', None, True),
+    'W_Playoff': ('Int64', None, True),
+    'L_Playoff': ('Int64', None, True),
+    'W-L%_Playoff': ('decimal', 3, True),
+    'Rank': ('Int64', None, True),
+    'Num': ('Int64', None, True),
+    'Won': ('Int64', None, True),
+    'Notes': ('string', None, True),
+}
+
+# CSV header -> Coach_Staging column. pandas suffixes repeated headers with
+# '.1', so the second G/W/L/W-L% block is always the playoff record.
+HEADER_MAP = {col: col for col in STAGING_SCHEMA if '_' not in col}
+HEADER_MAP.update({
+    'G.1': 'G_Playoff', 'G plyf': 'G_Playoff',
+    'W.1': 'W_Playoff', 'W plyf': 'W_Playoff',
+    'L.1': 'L_Playoff', 'L plyf': 'L_Playoff',
+    'W-L%.1': 'W-L%_Playoff', 'W-L% plyf': 'W-L%_Playoff',
+})
+
+# Manifest of imported files, used to skip unchanged CSVs on re-runs. It
+# holds one section per backend and database, see manifest_target()
+MANIFEST_FILE = 'import_manifest.json'
+
+# Bulk load settings
+BATCH_SIZE = 1000  # Rows sent per executemany call
+COMMIT_EVERY = 0  # Commit after this many batches (0 = one commit per file)
+
+# Streaming settings
+MEMORY_LIMIT_MB = 256  # Approximate ceiling for one chunk in flight per worker
+SAMPLE_ROWS = 1000  # Rows read up front to size the chunks
+CHUNK_OVERHEAD = 4  # Raw + cleaned + parameter copies of each row
+READ_CSV_OPTIONS = {'keep_default_na': False, 'na_values': ['', 'NA', 'N/A', 'null']}
+
+# Parallel import settings
+MAX_WORKERS = 4  # Files loaded concurrently, one pooled connection each
+
 def create_connection():
+    """Create a connection to the configured storage backend"""
+    if BACKEND == 'sqlite':
+        return create_sqlite_connection()
+    return create_sqlserver_connection()
+
+def create_sqlite_connection():
+    """Create a connection to the local SQLite database"""
+    try:
+        # Pooled connections are handed between import threads
+        conn = sqlite3.connect(SQLITE_DATABASE, timeout=60, check_same_thread=False)
+        print(f"Successfully connected to SQLite database {SQLITE_DATABASE}")
+        return conn
+    except Exception as e:
+        print(f"Error connecting to SQLite: {e}")
+        return None
+
+def create_sqlserver_connection():
     """Create a connection to SQL Server"""
+    if pyodbc is None:
+        print("Error connecting to SQL Server: pyodbc is not installed")
+        return None
     try:
         if USERNAME and PASSWORD:
             # SQL Server Authentication
@@ -41,8 +129,33 @@ def create_connection():
         print(f"Error connecting to SQL Server: {e}")
         return None
 
+def create_connection_pool(size):
+    """Open a pool of connections, one per import worker"""
+    pool = queue.Queue()
+    for _ in range(size):
+        conn = create_connection()
+        if not conn:
+            break
+        pool.put(conn)
+    return pool
+
+def close_connection_pool(pool):
+    """Close every connection held by the pool"""
+    while not pool.empty():
+        pool.get().close()
+
+def new_cursor(conn):
+    """Open a cursor, enabling pyodbc's array binding on SQL Server"""
+    cursor = conn.cursor()
+    if BACKEND == 'sqlserver':
+        cursor.fast_executemany = True
+    return cursor
+
 def create_staging_table(conn):
     """Create the Coach_Staging table if it doesn't exist"""
+    if BACKEND == 'sqlite':
+        create_sqlite_staging_table(conn)
+        return
     create_table_sql = """
     IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'Coach_Staging')
     BEGIN
@@ -76,6 +189,13 @@ def create_staging_table(conn):
     BEGIN
         PRINT 'Coach_Staging table already exists'
     END
+
+    -- Per-coach deletes would otherwise scan, and block on, other workers' rows
+    IF NOT EXISTS (SELECT * FROM sys.indexes
+                   WHERE name = 'IX_Coach_Staging_coach' AND object_id = OBJECT_ID('Coach_Staging'))
+    BEGIN
+        CREATE INDEX IX_Coach_Staging_coach ON Coach_Staging (coach)
+    END
     """
     
     try:
@@ -87,85 +207,79 @@ def create_staging_table(conn):
     except Exception as e:
         print(f"Error creating table: {e}")
 
-def clean_dataframe(df):
-    """Clean and prepare the dataframe for import"""
-    # Create a copy to avoid modifying original
-    df_clean = df.copy()
-    
-    # Handle empty strings, NaN values, and convert to None for SQL NULL
-    import numpy as np
-    df_clean = df_clean.replace('', None)
-    df_clean = df_clean.replace(np.nan, None)
+def create_sqlite_staging_table(conn):
+    """Create the SQLite version of the Coach_Staging table if it doesn't exist"""
+    create_table_sql = """
+    CREATE TABLE IF NOT EXISTS Coach_Staging (
+        coach TEXT,
+        Year INTEGER,
+        Age INTEGER,
+        Tm TEXT,
+        Lg TEXT,
+        G INTEGER,
+        W INTEGER,
+        L INTEGER,
+        T INTEGER,
+        [W-L%] REAL,
+        SRS REAL,
+        OSRS REAL,
+        DSRS REAL,
+        G_Playoff INTEGER,
+        W_Playoff INTEGER,
+        L_Playoff INTEGER,
+        [W-L%_Playoff] REAL,
+        [Rank] INTEGER,
+        Num INTEGER,
+        Won INTEGER,
+        Notes TEXT,
+        ImportDate TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """
     
-    # Also handle any whitespace-only values
-    df_clean = df_clean.replace(r'^\s*$', None, regex=True)
+    try:
+        conn.execute(create_table_sql)
+        conn.execute("CREATE INDEX IF NOT EXISTS IX_Coach_Staging_coach ON Coach_Staging (coach)")
+        conn.commit()
+        print("Table creation check completed")
+    except Exception as e:
+        print(f"Error creating table: {e}")
+
+def convert_column(series, dtype, scale):
+    """Convert one raw CSV column to its Coach_Staging type"""
+    if dtype == 'string':
+        values = series.astype('string').str.strip()
+        return values.replace('', pd.NA)
+    numbers = pd.to_numeric(series, errors='coerce')
+    if dtype == 'Int64':
+        return numbers.round().astype('Int64')
+    return numbers.round(scale)
+
+def clean_dataframe(df, report_unmapped=True):
+    """Map CSV headers onto Coach_Staging columns and convert them to SQL types
     
-    # Handle the column renaming more robustly
-    # First, let's standardize the column names
-    cols = df_clean.columns.tolist()
-    new_columns = []
+    Each column is renamed through HEADER_MAP and converted once, so the
+    result holds only staging columns, in table order, with NULLs as NA.
+    Rows missing a non-nullable column are dropped.
+    """
+    columns = {}
+    for header in df.columns:
+        target = HEADER_MAP.get(str(header).strip())
+        if target is None:
+            if report_unmapped:
+                print(f"Ignoring unmapped column '{header}'")
+            continue
+        dtype, scale, _ = STAGING_SCHEMA[target]
+        columns[target] = convert_column(df[header], dtype, scale)
     
-    for col in cols:
-        if col == 'coach':
-            new_columns.append('coach')
-        elif col == 'Year':
-            new_columns.append('Year')
-        elif col == 'Age':
-            new_columns.append('Age')
-        elif col == 'Tm':
-            new_columns.append('Tm')
-        elif col == 'Lg':
-            new_columns.append('Lg')
-        elif col == 'G' or col == 'G.1':
-            # First G is regular season, second is playoffs
-            if 'G' not in [c for c in new_columns]:
-                new_columns.append('G')
-            else:
-                new_columns.append('G_Playoff')
-        elif col == 'W' or col == 'W.1':
-            # First W is regular season, second is playoffs
-            if 'W' not in [c for c in new_columns]:
-                new_columns.append('W')
-            else:
-                new_columns.append('W_Playoff')
-        elif col == 'L' or col == 'L.1':
-            # First L is regular season, second is playoffs
-            if 'L' not in [c for c in new_columns]:
-                new_columns.append('L')
-            else:
-                new_columns.append('L_Playoff')
-        elif col == 'T':
-            new_columns.append('T')
-        elif col == 'W-L%' or col == 'W-L%.1':
-            # First W-L% is regular season, second is playoffs
-            if 'W-L%' not in [c for c in new_columns]:
-                new_columns.append('W-L%')
-            else:
-                new_columns.append('W-L%_Playoff')
-        elif col == 'SRS':
-            new_columns.append('SRS')
-        elif col == 'OSRS':
-            new_columns.append('OSRS')
-        elif col == 'DSRS':
-            new_columns.append('DSRS')
-        elif 'G plyf' in col:
-            new_columns.append('G_Playoff')
-        elif 'W plyf' in col:
-            new_columns.append('W_Playoff')
-        elif 'L plyf' in col:
-            new_columns.append('L_Playoff')
-        elif col == 'Rank':
-            new_columns.append('Rank')
-        elif col == 'Num':
-            new_columns.append('Num')
-        elif col == 'Won':
-            new_columns.append('Won')
-        elif col == 'Notes':
-            new_columns.append('Notes')
-        else:
-            new_columns.append(col)
+    df_clean = pd.DataFrame({col: columns[col] for col in STAGING_SCHEMA if col in columns},
+                            index=df.index)
     
-    df_clean.columns = new_columns
+    required = [col for col, (_, _, nullable) in STAGING_SCHEMA.items()
+                if not nullable and col in df_clean.columns]
+    incomplete = df_clean[required].isna().any(axis=1)
+    if incomplete.any():
+        print(f"Dropping {int(incomplete.sum())} row(s) missing {', '.join(required)}")
+        df_clean = df_clean[~incomplete]
     
     return df_clean
 
@@ -173,60 +287,240 @@ def truncate_staging_table(conn):
     """Truncate the Coach_Staging table to remove existing data"""
     try:
         cursor = conn.cursor()
-        cursor.execute("TRUNCATE TABLE Coach_Staging")
+        if BACKEND == 'sqlite':
+            # SQLite has no TRUNCATE; an unfiltered DELETE is optimised the same way
+            cursor.execute("DELETE FROM Coach_Staging")
+        else:
+            cursor.execute("TRUNCATE TABLE Coach_Staging")
         conn.commit()
         cursor.close()
         print("Coach_Staging table truncated successfully")
     except Exception as e:
         print(f"Error truncating table: {e}")
 
-def import_csv_to_sql(conn, csv_file):
-    """Import a single CSV file into SQL Server"""
+def count_staging_rows(conn):
+    """Return the number of rows in Coach_Staging"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM Coach_Staging")
+    total_rows = cursor.fetchone()[0]
+    cursor.close()
+    return total_rows
+
+def delete_coaches(conn, coaches):
+    """Delete every Coach_Staging row belonging to the given coaches"""
+    if not coaches:
+        return
+    cursor = new_cursor(conn)
+    cursor.executemany("DELETE FROM Coach_Staging WHERE coach = ?", [(coach,) for coach in coaches])
+    cursor.close()
+
+def file_fingerprint(csv_file):
+    """Return the size, mtime and SHA-256 content hash of a file"""
+    stat = os.stat(csv_file)
+    sha256 = hashlib.sha256()
+    with open(csv_file, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(block)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': sha256.hexdigest()}
+
+def manifest_target():
+    """Name of the database the manifest section describes"""
+    if BACKEND == 'sqlite':
+        return f"sqlite:{os.path.abspath(SQLITE_DATABASE)}"
+    return f"sqlserver:{SERVER}/{DATABASE}"
+
+def read_manifest_file():
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    try:
+        with open(MANIFEST_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading manifest, doing a full reload: {e}")
+        return {}
+
+def load_manifest():
+    """Load the import manifest of the current database, keyed by CSV path"""
+    return read_manifest_file().get(manifest_target(), {})
+
+def save_manifest(manifest):
+    """Write the current database's manifest atomically, keeping the others"""
+    manifests = read_manifest_file()
+    manifests[manifest_target()] = manifest
+    temp_file = MANIFEST_FILE + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifests, f, indent=2, sort_keys=True)
+    os.replace(temp_file, MANIFEST_FILE)
+
+def plan_import(csv_files, manifest):
+    """Split CSV files into new/changed files and return paths no longer on disk
+    
+    Files whose size and mtime match the manifest are skipped without hashing;
+    otherwise the content hash decides whether the file really changed.
+    """
+    changed = []
+    for csv_file in csv_files:
+        key = csv_file.as_posix()
+        entry = manifest.get(key)
+        stat = os.stat(csv_file)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            continue
+        fingerprint = file_fingerprint(csv_file)
+        if entry and entry['sha256'] == fingerprint['sha256']:
+            # Touched but identical, just remember the new mtime
+            entry.update(fingerprint)
+            continue
+        changed.append(csv_file)
+    
+    on_disk = {csv_file.as_posix() for csv_file in csv_files}
+    removed = [key for key in manifest if key not in on_disk]
+    return changed, removed
+
+def column_values(series):
+    """Return a column as a list of Python values with NaN/NA mapped to None"""
+    values = series.astype(object)
+    return values.where(series.notna(), None).tolist()
+
+def build_parameters(df):
+    """Build INSERT parameter tuples straight from the column arrays"""
+    columns = [column_values(df[col]) for col in df.columns]
+    return list(zip(*columns))
+
+def rows_per_chunk(csv_file, memory_limit_mb=MEMORY_LIMIT_MB):
+    """Estimate how many CSV rows can be in flight under the memory ceiling"""
+    sample = pd.read_csv(csv_file, nrows=SAMPLE_ROWS, **READ_CSV_OPTIONS)
+    if sample.empty:
+        return SAMPLE_ROWS
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+    # The raw chunk, its cleaned frame and the parameter tuples coexist
+    return max(1, int(memory_limit_mb * 1024 * 1024 / (bytes_per_row * CHUNK_OVERHEAD)))
+
+def import_csv_to_sql(conn, csv_file, batch_size=BATCH_SIZE, commit_every=COMMIT_EVERY,
+                      stale_coaches=(), memory_limit_mb=MEMORY_LIMIT_MB):
+    """Stream a single CSV file into Coach_Staging using batched executemany
+    
+    The file is read, cleaned and inserted one chunk at a time, with the
+    chunk size picked to stay under memory_limit_mb.
+    
+    The file replaces earlier data: rows for every coach in the file, and
+    for the stale_coaches an earlier version of it held, are deleted first
+    in the same transaction as the insert. Returns (rows_inserted, coaches),
+    or None if the import failed.
+    """
     try:
-        # Read CSV file with better handling of empty values
-        df = pd.read_csv(csv_file, keep_default_na=False, na_values=['', 'NA', 'N/A', 'null'])
         print(f"\nProcessing {csv_file}")
-        print(f"Rows found: {len(df)}")
+        chunk_rows = rows_per_chunk(csv_file, memory_limit_mb)
         
-        # Clean the dataframe
-        df_clean = clean_dataframe(df)
+        cursor = new_cursor(conn)
         
-        # Insert data
-        cursor = conn.cursor()
-        
-        # Build INSERT statement
-        columns = df_clean.columns.tolist()
-        placeholders = ','.join(['?' for _ in columns])
-        column_names = ','.join([f'[{col}]' for col in columns])
-        
-        insert_sql = f"INSERT INTO Coach_Staging ({column_names}) VALUES ({placeholders})"
+        file_coaches = set()
+        delete_coaches(conn, stale_coaches)
+        seen_coaches = set(stale_coaches)
         
-        # Insert rows
+        rows_read = 0
         rows_inserted = 0
-        for index, row in df_clean.iterrows():
-            # Convert any remaining NaN values to None
-            values = []
-            for col in columns:
-                val = row[col]
-                if pd.isna(val):  # Handle NaN, None, etc.
-                    values.append(None)
-                else:
-                    values.append(val)
-            values = tuple(values)
-            
-            cursor.execute(insert_sql, values)
-            rows_inserted += 1
+        batch_number = 0
+        with pd.read_csv(csv_file, chunksize=chunk_rows, **READ_CSV_OPTIONS) as reader:
+            for chunk_number, chunk in enumerate(reader):
+                rows_read += len(chunk)
+                
+                # Clean the chunk
+                df_clean = clean_dataframe(chunk, report_unmapped=chunk_number == 0)
+                
+                chunk_coaches = set(df_clean['coach'].dropna().unique())
+                file_coaches.update(chunk_coaches)
+                new_coaches = chunk_coaches - seen_coaches
+                delete_coaches(conn, sorted(new_coaches))
+                seen_coaches.update(new_coaches)
+                
+                # Build INSERT statement
+                columns = df_clean.columns.tolist()
+                placeholders = ','.join(['?' for _ in columns])
+                column_names = ','.join([f'[{col}]' for col in columns])
+                
+                insert_sql = f"INSERT INTO Coach_Staging ({column_names}) VALUES ({placeholders})"
+                
+                # Insert rows in batches, committing every commit_every batches
+                params = build_parameters(df_clean)
+                del df_clean
+                for start in range(0, len(params), batch_size):
+                    batch = params[start:start + batch_size]
+                    cursor.executemany(insert_sql, batch)
+                    rows_inserted += len(batch)
+                    batch_number += 1
+                    if commit_every and batch_number % commit_every == 0:
+                        conn.commit()
         
         conn.commit()
         cursor.close()
+        print(f"Rows found: {rows_read}")
         print(f"Successfully imported {rows_inserted} rows from {os.path.basename(csv_file)}")
+        return rows_inserted, sorted(file_coaches)
         
     except Exception as e:
         print(f"Error importing {csv_file}: {e}")
         conn.rollback()
+        return None
 
-def main():
-    """Main function to process all CSV files"""
+def import_worker(pool, csv_file, stale_coaches=()):
+    """Import one CSV file in its own transaction on a pooled connection"""
+    conn = pool.get()
+    try:
+        start = time.perf_counter()
+        result = import_csv_to_sql(conn, csv_file, stale_coaches=stale_coaches)
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.put(conn)
+    return threading.current_thread().name, csv_file, result, elapsed
+
+def print_worker_summary(results):
+    """Print rows imported and rows/sec for each worker thread"""
+    stats = {}
+    for worker, _, result, elapsed in results:
+        rows = result[0] if result else 0
+        files, total_rows, total_time = stats.get(worker, (0, 0, 0.0))
+        stats[worker] = (files + 1, total_rows + rows, total_time + elapsed)
+    
+    print("\n=== Worker Summary ===")
+    for worker, (files, total_rows, total_time) in sorted(stats.items()):
+        rate = total_rows / total_time if total_time else 0
+        print(f"{worker}: {files} file(s), {total_rows} rows, {rate:.0f} rows/sec")
+
+def import_files(csv_files, manifest):
+    """Import files concurrently, one transaction per file, updating the manifest
+    
+    Each file replaces the rows of the coaches it holds, plus those an
+    earlier version of it held if it is already in the manifest.
+    """
+    # SQLite allows a single writer, so parallel workers would only queue up
+    workers = 1 if BACKEND == 'sqlite' else min(MAX_WORKERS, len(csv_files))
+    pool = create_connection_pool(workers)
+    if pool.empty():
+        return []
+    
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=pool.qsize(), thread_name_prefix='import') as executor:
+            futures = []
+            for csv_file in csv_files:
+                entry = manifest.get(csv_file.as_posix())
+                stale_coaches = entry.get('coaches', []) if entry else []
+                futures.append(executor.submit(import_worker, pool, csv_file, stale_coaches))
+            for future in as_completed(futures):
+                results.append(future.result())
+    finally:
+        close_connection_pool(pool)
+    
+    for _, csv_file, result, _ in results:
+        if result is None:
+            continue
+        entry = file_fingerprint(csv_file)
+        entry['coaches'] = result[1]
+        manifest[csv_file.as_posix()] = entry
+    return results
+
+def main(full_reload=False):
+    """Import new and changed CSV files, or every file when full_reload is set"""
     # Check if data directory exists
     if not os.path.exists(DATA_DIR):
         print(f"Error: Directory '{DATA_DIR}' not found")
@@ -241,30 +535,50 @@ def main():
     
     print(f"Found {len(csv_files)} CSV file(s) to process")
     
-    # Connect to SQL Server
+    # Connect to the storage backend
     conn = create_connection()
     if not conn:
         return
     
+    manifest = {} if full_reload else load_manifest()
+    
     try:
         # Create table if it doesn't exist
         create_staging_table(conn)
         
-        # Truncate table to remove existing data
-        truncate_staging_table(conn)
+        if manifest and count_staging_rows(conn) == 0:
+            # A new or recreated table holds none of the files the manifest lists
+            print("Coach_Staging is empty, doing a full reload")
+            manifest = {}
         
-        # Process each CSV file
-        for csv_file in csv_files:
-            import_csv_to_sql(conn, csv_file)
+        if not manifest:
+            # No record of earlier imports, start from an empty table
+            truncate_staging_table(conn)
+            to_import, removed = csv_files, []
+        else:
+            to_import, removed = plan_import(csv_files, manifest)
+            print(f"{len(to_import)} new or changed file(s), {len(removed)} removed")
+        
+        # Drop coaches whose files have gone away
+        for key in removed:
+            delete_coaches(conn, manifest.pop(key).get('coaches', []))
+        conn.commit()
+        
+        results = []
+        if to_import:
+            results = import_files(to_import, manifest)
+        
+        failed = sum(1 for _, _, result, _ in results if result is None)
+        if failed:
+            print(f"\n{failed} file(s) failed to import")
+        if results:
+            print_worker_summary(results)
+        save_manifest(manifest)
         
         print("\n=== Import Complete ===")
         
         # Display summary
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM Coach_Staging")
-        total_rows = cursor.fetchone()[0]
-        print(f"Total rows in Coach_Staging: {total_rows}")
-        cursor.close()
+        print(f"Total rows in Coach_Staging: {count_staging_rows(conn)}")
         
     finally:
         conn.close()
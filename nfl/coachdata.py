@@ -1,95 +1,139 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from pfr_parse import parse_heading, parse_table_text
+from pfr_pages import load_page
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import csv
-import time
+import os
+import queue
+import sys
 
-def scrape_coaching_stats(url):
-    # Set up Chrome options
+# Browser sessions shared by the coaches being scraped
+NUM_DRIVERS = 1
+
+# Coaches queued per driver, so an interrupt only waits for pages already loading
+QUEUED_PER_DRIVER = 2
+
+# Per-coach CSVs land here, next to the files CoachImport already loads
+OUTPUT_DIR = 'rawdata'
+
+def setup_driver():
+    """Set up Chrome with the options used for coach pages"""
     chrome_options = Options()
     # chrome_options.add_argument('--headless')  # Run in background
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+
+    return webdriver.Chrome(options=chrome_options)
+
+def output_path(coach_name, output_dir=OUTPUT_DIR):
+    """CSV path for a coach, e.g. rawdata/BillParcells.csv
     
-    # Initialize the driver
-    driver = webdriver.Chrome(options=chrome_options)
-    
+    An existing file for the coach is reused whatever its case (older files
+    are lowercase, e.g. billbelichick.csv) so CoachImport never sees a coach twice.
+    """
+    file_name = ''.join(ch for ch in coach_name if ch.isalnum()) + '.csv'
+    if os.path.isdir(output_dir):
+        for existing in os.listdir(output_dir):
+            if existing.lower() == file_name.lower():
+                return os.path.join(output_dir, existing)
+    return os.path.join(output_dir, file_name)
+
+def scrape_coach(driver, url, coach_name=None, output_dir=OUTPUT_DIR):
+    """Scrape one coach page and write its seasons in the rawdata/*.csv schema
+
+    Returns the path written, or None if the page had no seasons.
+    """
+    # Load the page within the site's request budget; the table is complete once it is in the DOM
+    load_page(driver, url, EC.presence_of_element_located((By.ID, "coach")))
+
+    html = driver.page_source
+    header, rows = parse_table_text(html, 'coach')
+
+    # Keep season rows only; career totals have no year
+    seasons = [row for row in rows if row and row[0][:4].isdigit()]
+    if not seasons:
+        print(f"No seasons found at {url}")
+        return None
+
+    if not coach_name:
+        coach_name = parse_heading(html)
+
+    output_file = output_path(coach_name, output_dir)
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['coach'] + header)
+        for row in seasons:
+            writer.writerow([coach_name] + row)
+
+    print(f"Scraped {len(seasons)} seasons for {coach_name} into {output_file}")
+    return output_file
+
+def scrape_coaching_stats(coaches, num_drivers=NUM_DRIVERS, output_dir=OUTPUT_DIR):
+    """Scrape many coaches, reusing a pool of browser sessions
+
+    coaches is a list of coach page URLs, or of dicts with 'url' and
+    'name' keys such as those returned by get_coaches_list. Returns the
+    list of CSV files written.
+    """
+    coaches = [{'url': coach} if isinstance(coach, str) else coach for coach in coaches]
+    if not coaches:
+        print("No coaches to scrape")
+        return []
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Initialize the drivers once for the whole batch
+    drivers = [setup_driver() for _ in range(min(num_drivers, len(coaches)))]
+    driver_pool = queue.Queue()
+    for driver in drivers:
+        driver_pool.put(driver)
+
+    def scrape(coach):
+        driver = driver_pool.get()
+        try:
+            return scrape_coach(driver, coach['url'], coach.get('name'), output_dir)
+        except Exception as e:
+            print(f"Error occurred for {coach['url']}: {str(e)}")
+            return None
+        finally:
+            driver_pool.put(driver)
+
+    written = []
+    remaining = iter(coaches)
+    executor = ThreadPoolExecutor(max_workers=len(drivers))
     try:
-        # Load the page
-        driver.get(url)
-        
-        # Wait for the table to load
-        wait = WebDriverWait(driver, 10)
-        table = wait.until(EC.presence_of_element_located((By.ID, "coach")))
-        
-        # Give it a moment to fully render
-        time.sleep(2)
-        
-        # Find all rows in the tbody
-        rows = table.find_element(By.TAG_NAME, "tbody").find_elements(By.TAG_NAME, "tr")
-        
-        # Prepare data list
-        coaching_data = []
-        
-        # Extract data from each row
-        for row in rows:
-            # Skip rows that are headers or empty
-            if 'thead' in row.get_attribute('class') or not row.text.strip():
-                continue
-            
-            cells = row.find_elements(By.TAG_NAME, "td")
-            if len(cells) < 5:
-                continue
-            
-            # Extract year
-            year_cell = row.find_element(By.TAG_NAME, "th")
-            year = year_cell.text.strip()
-            
-            # Extract other data
-            team = cells[1].text.strip()
-            wins = cells[3].text.strip()
-            losses = cells[4].text.strip()
-            ties = cells[5].text.strip() if len(cells) > 5 else "0"
-            
-            # Get coach name from page title or header
-            if not coaching_data:  # First row, get the coach name
-                page_title = driver.title
-                coach_name = page_title.split(' Stats')[0].strip()
-            
-            coaching_data.append({
-                'name': coach_name,
-                'year': year,
-                'team': team,
-                'wins': wins,
-                'losses': losses,
-                'ties': ties
-            })
-        
-        # Write to CSV
-        output_file = 'coaching_stats.csv'
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = ['name', 'year', 'team', 'wins', 'losses', 'ties']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(coaching_data)
-        
-        print(f"Successfully scraped {len(coaching_data)} records")
-        print(f"Data saved to {output_file}")
-        
-        # Print first few rows as preview
-        print("\nPreview:")
-        for i, row in enumerate(coaching_data[:5]):
-            print(row)
-        
-    except Exception as e:
-        print(f"Error occurred: {str(e)}")
-    
+        pending = deque(executor.submit(scrape, coach)
+                        for coach in islice(remaining, len(drivers) * QUEUED_PER_DRIVER))
+        while pending:
+            future = pending.popleft()
+            for coach in islice(remaining, 1):
+                pending.append(executor.submit(scrape, coach))
+            path = future.result()
+            if path:
+                written.append(path)
     finally:
-        driver.quit()
+        executor.shutdown(cancel_futures=True)
+        for driver in drivers:
+            driver.quit()
+
+    print(f"Successfully scraped {len(written)} of {len(coaches)} coaches")
+    return written
+
+def load_coaches_list(list_file):
+    """Read the coaches list CSV written by nfl_coaches_scraper.py"""
+    with open(list_file, newline='', encoding='utf-8') as f:
+        return [{'name': row['Name'], 'url': row['URL']} for row in csv.DictReader(f)]
 
 if __name__ == "__main__":
-    url = "https://www.pro-football-reference.com/coaches/HalaGe0.htm"
-    scrape_coaching_stats(url)
\ No newline at end of file
+    # Coach page URLs, or a coaches list CSV from nfl_coaches_scraper.py
+    args = sys.argv[1:] or ["https://www.pro-football-reference.com/coaches/HalaGe0.htm"]
+    if len(args) == 1 and args[0].endswith('.csv'):
+        coaches = load_coaches_list(args[0])
+    else:
+        coaches = args
+    scrape_coaching_stats(coaches)
@@ -1,10 +1,15 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
+from page_cache import PageCache
+from pfr_pages import CACHE_DIR, MAX_CACHE_MB, PAGE_TTL, career_ttl, load_page, table_html
+from pfr_parse import parse_coaches_list, parse_coaching_record
 import csv
-import time
+
+# On-disk page cache shared with nfl_coaches_scraper.py
+page_cache = PageCache(CACHE_DIR, MAX_CACHE_MB * 1024 * 1024)
 
 def setup_driver():
     """Setup Chrome driver with options"""
@@ -23,44 +28,25 @@ def setup_driver():
 
 def get_coaches_list(driver, url):
     """Get list of all coaches from the main page"""
-    driver.get(url)
-    time.sleep(5)  # Wait for page to load
-    
     coaches = []
     
+    try:
+        load_page(driver, url, EC.presence_of_element_located((By.ID, 'coaches')))
+    except TimeoutException:
+        print("Timed out waiting for the 'coaches' table")
+    
     # Debug: Save page source
+    page_source = driver.page_source
     with open('debug_page.html', 'w', encoding='utf-8') as f:
-        f.write(driver.page_source)
+        f.write(page_source)
     print("Saved page source to debug_page.html")
     
     try:
-        # Try multiple possible selectors
-        # Method 1: Look for table with id 'coaches'
-        try:
-            table = driver.find_element(By.ID, 'coaches')
-            print("Found table with ID 'coaches'")
-        except:
-            print("No table with ID 'coaches', trying alternative...")
-            # Method 2: Look for any table
-            tables = driver.find_elements(By.TAG_NAME, 'table')
-            print(f"Found {len(tables)} tables on page")
-            if tables:
-                table = tables[0]
-            else:
-                return coaches
-        
-        # Find all links in the table
-        links = table.find_elements(By.TAG_NAME, 'a')
-        print(f"Found {len(links)} links in table")
-        
-        for link in links:
-            try:
-                coach_name = link.text.strip()
-                coach_url = link.get_attribute('href')
-                if coach_name and coach_url and '/coaches/' in coach_url:
-                    coaches.append((coach_name, coach_url))
-            except:
-                continue
+        # Parse the table straight from the saved source
+        coaches = [(coach['name'], coach['url'], coach['to'])
+                   for coach in parse_coaches_list(page_source, url)]
+        if not coaches:
+            print("No table with ID 'coaches' found in page source")
                 
     except Exception as e:
         print(f"Error getting coaches list: {e}")
@@ -69,60 +55,16 @@ def get_coaches_list(driver, url):
     
     return coaches
 
-def get_coach_career(driver, coach_url):
+def get_coach_career(driver, coach_url, ttl=PAGE_TTL):
     """Get coaching career details for a specific coach"""
-    driver.get(coach_url)
-    time.sleep(3)  # Wait for page to load
-    
     career_data = []
     try:
-        # Pro-Football-Reference often puts tables in HTML comments
-        # We need to use JavaScript to extract them
-        driver.execute_script("""
-            var comments = document.evaluate('//comment()', document, null, XPathResult.ANY_TYPE, null);
-            var comment = comments.iterateNext();
-            while (comment) {
-                if (comment.nodeValue.indexOf('id="coaching_record"') !== -1) {
-                    var div = document.createElement('div');
-                    div.innerHTML = comment.nodeValue;
-                    comment.parentNode.replaceChild(div, comment);
-                    break;
-                }
-                comment = comments.iterateNext();
-            }
-        """)
-        
-        time.sleep(1)
-        
-        # Now try to find the table
-        table = driver.find_element(By.ID, 'coaching_record')
-        rows = table.find_elements(By.TAG_NAME, 'tr')
-        
-        for row in rows:
-            try:
-                # Get all cells (th and td)
-                year_cell = row.find_element(By.CSS_SELECTOR, '[data-stat="year"]')
-                team_cell = row.find_element(By.CSS_SELECTOR, '[data-stat="team"]')
-                
-                year = year_cell.text.strip()
-                
-                # Get the team abbreviation from the link if it exists
-                try:
-                    team_link = team_cell.find_element(By.TAG_NAME, 'a')
-                    team_url = team_link.get_attribute('href')
-                    # Extract team code from URL like /teams/chi/2024.htm
-                    if '/teams/' in team_url:
-                        team_code = team_url.split('/teams/')[1].split('/')[0].upper()
-                    else:
-                        team_code = team_link.text.strip()
-                except:
-                    team_code = team_cell.text.strip()
-                
-                # Skip empty or summary rows
-                if year and team_code and year.isdigit():
-                    career_data.append((team_code, year))
-            except:
-                continue
+        # Use the cached table, or wait until it exists and cache its markup
+        html = page_cache.get(coach_url, ttl)
+        if html is None:
+            html = load_page(driver, coach_url, table_html('coaching_record'))
+            page_cache.put(coach_url, html)
+        career_data = parse_coaching_record(html)
                 
     except Exception as e:
         print(f"Error getting career data: {e}")
@@ -153,17 +95,14 @@ def main():
             writer.writerow(['Team', 'Year', 'Coach Name'])
             
             # Loop through each coach
-            for i, (coach_name, coach_url) in enumerate(coaches, 1):
+            for i, (coach_name, coach_url, to_year) in enumerate(coaches, 1):
                 print(f"Processing {i}/{len(coaches)}: {coach_name}")
                 
                 try:
-                    career = get_coach_career(driver, coach_url)
+                    career = get_coach_career(driver, coach_url, career_ttl(to_year))
                     for team, year in career:
                         writer.writerow([team, year, coach_name])
                     
-                    # Be polite - add delay between requests
-                    time.sleep(3)
-                    
                 except Exception as e:
                     print(f"Error processing {coach_name}: {e}")
                     continue
@@ -1,16 +1,48 @@
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from page_cache import PageCache
+from pfr_pages import CACHE_DIR, MAX_CACHE_MB, PAGE_TTL, career_ttl, load_page, table_html
+from rate_limiter import rate_limiter
+from pfr_parse import parse_coaches_list, parse_coaching_record
+from scrape_metrics import ScrapeMetrics, new_page_stats
 import csv
+import os
+import queue
+import sys
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
-def setup_driver():
+# Number of browser sessions scraping coach pages at once
+NUM_DRIVERS = 4
+HEADLESS = True
+
+# Coach pages queued per driver ahead of the CSV writer
+QUEUED_PER_DRIVER = 2
+
+# Fetch pages over plain HTTP (with conditional revalidation) instead of Chrome
+USE_BROWSER = True
+
+# On-disk page cache shared with coachscrape.py
+page_cache = PageCache(CACHE_DIR, MAX_CACHE_MB * 1024 * 1024)
+
+# Career history output and the journal of coaches already written to it
+OUTPUT_FILE = 'nfl_coaches_history.csv'
+JOURNAL_FILE = 'nfl_coaches_history.journal'
+
+# Per-request metrics, one JSON object per line
+METRICS_FILE = 'scrape_metrics.jsonl'
+
+# ScrapeMetrics for the current run, created by main()
+metrics = None
+
+def setup_driver(headless=False):
     """Setup Chrome driver with options"""
     options = Options()
-    # Comment out headless to see what's happening
-    # options.add_argument('--headless')  # Run in background
+    # Leave headless off to see what's happening
+    if headless:
+        options.add_argument('--headless')  # Run in background
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('--disable-blink-features=AutomationControlled')
@@ -21,135 +53,168 @@ def setup_driver():
     driver = webdriver.Chrome(options=options)
     return driver
 
+def fetch_page(driver, url, table_id, ttl, stats):
+    """Return HTML holding the table_id table, from the cache when younger than ttl
+    
+    Cache misses are loaded over HTTP when driver is None (caching the whole
+    page), or with the browser, which hands back and caches just the table's
+    markup in a single script call.
+    """
+    start = time.perf_counter()
+    html = page_cache.get(url, ttl)
+    if html is not None:
+        stats['cached'] = True
+        stats['fetch'] += time.perf_counter() - start
+        return html
+    if driver is None:
+        stats['sleep'] += rate_limiter.wait(url)
+        start = time.perf_counter()
+        html = page_cache.fetch(url)
+        stats['fetch'] += time.perf_counter() - start
+        return html
+    html = load_page(driver, url, table_html(table_id), stats)
+    page_cache.put(url, html)
+    return html
+
 def get_coaches_list(driver, url):
     """Get list of all coaches from the main page"""
-    driver.get(url)
-    time.sleep(5)  # Wait for page to load
-    
     coaches = []
+    stats = new_page_stats()
     
     try:
-        # Find the coaches table
-        table = driver.find_element(By.ID, 'coaches')
-        tbody = table.find_element(By.TAG_NAME, 'tbody')
-        rows = tbody.find_elements(By.TAG_NAME, 'tr')
-        
-        print(f"Found {len(rows)} rows in table")
-        
-        for row in rows:
-            try:
-                # Skip header rows
-                if 'thead' in row.get_attribute('class') or '':
-                    continue
-                
-                cells = row.find_elements(By.TAG_NAME, 'td')
-                if len(cells) < 7:
-                    continue
-                
-                # Get coach name and URL from first cell
-                name_cell = row.find_element(By.CSS_SELECTOR, 'th[data-stat="coach"]')
-                link = name_cell.find_element(By.TAG_NAME, 'a')
-                coach_name = link.text.strip()
-                coach_url = link.get_attribute('href')
-                
-                # Get stats from cells
-                yrs = cells[0].text.strip()  # data-stat="yrs"
-                from_year = cells[1].text.strip()  # data-stat="year_min"
-                to_year = cells[2].text.strip()  # data-stat="year_max"
-                games = cells[3].text.strip()  # data-stat="g"
-                wins = cells[4].text.strip()  # data-stat="w"
-                losses = cells[5].text.strip()  # data-stat="l"
-                ties = cells[6].text.strip()  # data-stat="t"
-                
-                if coach_name and coach_url:
-                    coaches.append({
-                        'name': coach_name,
-                        'url': coach_url,
-                        'yrs': yrs,
-                        'from': from_year,
-                        'to': to_year,
-                        'g': games,
-                        'w': wins,
-                        'l': losses,
-                        't': ties
-                    })
-            except Exception as e:
-                continue
+        # Wait for the coaches table to render, then parse its markup
+        html = fetch_page(driver, url, 'coaches', PAGE_TTL, stats)
+        start = time.perf_counter()
+        coaches = parse_coaches_list(html, url)
+        stats['parse'] = time.perf_counter() - start
                 
     except Exception as e:
+        stats['failed'] = True
         print(f"Error getting coaches list: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if metrics is not None:
+            metrics.record('coaches_list', url, stats, len(coaches))
     
     return coaches
 
-def get_coach_career(driver, coach_url):
-    """Get coaching career details for a specific coach"""
-    driver.get(coach_url)
-    time.sleep(3)  # Wait for page to load
+def get_coach_career(driver, coach_url, ttl=PAGE_TTL):
+    """Get coaching career details for a specific coach
     
+    Returns a list of (team, year) pairs, or None if the page failed.
+    """
     career_data = []
+    stats = new_page_stats()
     try:
-        # Pro-Football-Reference often puts tables in HTML comments
-        # We need to use JavaScript to extract them
-        driver.execute_script("""
-            var comments = document.evaluate('//comment()', document, null, XPathResult.ANY_TYPE, null);
-            var comment = comments.iterateNext();
-            while (comment) {
-                if (comment.nodeValue.indexOf('id="coaching_record"') !== -1) {
-                    var div = document.createElement('div');
-                    div.innerHTML = comment.nodeValue;
-                    comment.parentNode.replaceChild(div, comment);
-                    break;
-                }
-                comment = comments.iterateNext();
-            }
-        """)
-        
-        time.sleep(1)
-        
-        # Now try to find the table
-        table = driver.find_element(By.ID, 'coaching_record')
-        rows = table.find_elements(By.TAG_NAME, 'tr')
-        
-        for row in rows:
-            try:
-                # Get all cells (th and td)
-                year_cell = row.find_element(By.CSS_SELECTOR, '[data-stat="year"]')
-                team_cell = row.find_element(By.CSS_SELECTOR, '[data-stat="team"]')
-                
-                year = year_cell.text.strip()
-                
-                # Get the team abbreviation from the link if it exists
-                try:
-                    team_link = team_cell.find_element(By.TAG_NAME, 'a')
-                    team_url = team_link.get_attribute('href')
-                    # Extract team code from URL like /teams/chi/2024.htm
-                    if '/teams/' in team_url:
-                        team_code = team_url.split('/teams/')[1].split('/')[0].upper()
-                    else:
-                        team_code = team_link.text.strip()
-                except:
-                    team_code = team_cell.text.strip()
-                
-                # Skip empty or summary rows
-                if year and team_code and year.isdigit():
-                    career_data.append((team_code, year))
-            except:
-                continue
+        # Wait until the table exists, then parse its markup
+        html = fetch_page(driver, coach_url, 'coaching_record', ttl, stats)
+        start = time.perf_counter()
+        career_data = parse_coaching_record(html)
+        stats['parse'] = time.perf_counter() - start
                 
     except Exception as e:
+        stats['failed'] = True
         print(f"Error getting career data: {e}")
         import traceback
         traceback.print_exc()
+        return None
+    finally:
+        if metrics is not None:
+            metrics.record('coach_career', coach_url, stats, len(career_data))
     
     return career_data
 
-def main():
+def scrape_careers(coaches, driver_pool):
+    """Scrape every coach's career on a pool of drivers fed from a work queue
+    
+    Yields (coach, career) in the original coach order; career is None if
+    the coach could not be scraped. Only a small window of coaches is queued
+    ahead of the consumer, and whatever is still queued is cancelled if the
+    consumer stops early or is interrupted.
+    """
+    def scrape(coach):
+        driver = driver_pool.get()
+        try:
+            return get_coach_career(driver, coach['url'], career_ttl(coach['to']))
+        finally:
+            driver_pool.put(driver)
+    
+    workers = driver_pool.qsize()
+    window = workers * QUEUED_PER_DRIVER
+    coaches = iter(coaches)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = deque((coach, executor.submit(scrape, coach)) for coach in islice(coaches, window))
+        while pending:
+            coach, future = pending.popleft()
+            for next_coach in islice(coaches, 1):
+                pending.append((next_coach, executor.submit(scrape, next_coach)))
+            try:
+                career = future.result()
+            except Exception as e:
+                print(f"Error processing {coach['name']}: {e}")
+                career = None
+            yield coach, career
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def load_journal():
+    """Read the checkpoint journal: completed coach URLs and the output size after them"""
+    completed = set()
+    offset = None
+    if os.path.exists(JOURNAL_FILE):
+        with open(JOURNAL_FILE, encoding='utf-8') as f:
+            for line in f:
+                # A line cut short by a crash has no newline and may hold a wrong offset
+                if not line.endswith('\n'):
+                    break
+                url, _, size = line[:-1].rpartition('\t')
+                if url and size.isdigit():
+                    completed.add(url)
+                    offset = int(size)
+    return completed, offset
+
+def open_history(resume):
+    """Open the career history CSV and journal for appending
+    
+    On resume, output past the last checkpoint (rows of a coach that was
+    being written when the run died) is cut off so no rows are duplicated.
+    Returns (output file, journal file, completed coach URLs).
+    """
+    completed, offset = load_journal() if resume else (set(), None)
+    if offset is not None and os.path.exists(OUTPUT_FILE):
+        out = open(OUTPUT_FILE, 'r+', newline='', encoding='utf-8')
+        out.truncate(offset)
+        out.seek(offset)
+        # Drop a partly written last line so new checkpoints start on a line of their own
+        with open(JOURNAL_FILE, 'rb+') as f:
+            f.truncate(f.read().rfind(b'\n') + 1)
+        journal = open(JOURNAL_FILE, 'a', encoding='utf-8')
+        return out, journal, completed
+    
+    out = open(OUTPUT_FILE, 'w', newline='', encoding='utf-8')
+    csv.writer(out).writerow(['Team', 'Year', 'Coach Name'])
+    journal = open(JOURNAL_FILE, 'w', encoding='utf-8')
+    return out, journal, set()
+
+def main(resume=False):
+    global metrics
     base_url = 'https://www.pro-football-reference.com/coaches/'
     
-    print("Setting up browser...")
-    driver = setup_driver()
+    if USE_BROWSER:
+        print(f"Setting up {NUM_DRIVERS} browser(s)...")
+        drivers = [setup_driver(headless=HEADLESS) for _ in range(NUM_DRIVERS)]
+    else:
+        # Workers fetch over HTTP; the pool only bounds concurrency
+        drivers = [None] * NUM_DRIVERS
+    driver_pool = queue.Queue()
+    for pooled_driver in drivers:
+        driver_pool.put(pooled_driver)
+    driver = drivers[0]
+    
+    # Start the clock once the browsers are up; a resumed run adds to the metrics file
+    metrics = ScrapeMetrics(METRICS_FILE, append=resume)
     
     try:
         print("Fetching coaches list...")
@@ -181,35 +246,36 @@ def main():
         
         print(f"Coaches list saved to {coaches_list_file}")
         
-        # Prepare CSV output for career history
-        output_file = 'nfl_coaches_history.csv'
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Team', 'Year', 'Coach Name'])
+        # Prepare CSV output for career history, skipping finished coaches on resume
+        out, journal, completed = open_history(resume)
+        remaining = [coach for coach in coaches if coach['url'] not in completed]
+        if completed:
+            print(f"Resuming: {len(completed)} coaches already done, {len(remaining)} to go")
+        
+        with out, journal:
+            writer = csv.writer(out)
             
-            # Loop through each coach
-            for i, coach in enumerate(coaches, 1):
-                coach_name = coach['name']
-                coach_url = coach['url']
-                
-                print(f"Processing {i}/{len(coaches)}: {coach_name}")
-                
-                try:
-                    career = get_coach_career(driver, coach_url)
-                    for team, year in career:
-                        writer.writerow([team, year, coach_name])
-                    
-                    # Be polite - add delay between requests
-                    time.sleep(3)
-                    
-                except Exception as e:
-                    print(f"Error processing {coach_name}: {e}")
+            # Scrape coaches concurrently, writing results in list order
+            done = len(coaches) - len(remaining)
+            for i, (coach, career) in enumerate(scrape_careers(remaining, driver_pool), done + 1):
+                print(f"Processing {i}/{len(coaches)}: {coach['name']}")
+                if career is None:
+                    # Not checkpointed, so --resume will retry this coach
                     continue
-        
-        print(f"\nDone! Career history saved to {output_file}")
+                for team, year in career:
+                    writer.writerow([team, year, coach['name']])
+                
+                # Checkpoint once the coach's rows are safely on disk
+                out.flush()
+                journal.write(f"{coach['url']}\t{out.tell()}\n")
+                journal.flush()
+        print(f"\nDone! Career history saved to {OUTPUT_FILE}")
+        metrics.print_summary()
         
     finally:
-        driver.quit()
+        for pooled_driver in drivers:
+            if pooled_driver is not None:
+                pooled_driver.quit()
 
 if __name__ == "__main__":
-    main()
+    main(resume='--resume' in sys.argv[1:])
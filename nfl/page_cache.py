@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+class PageCache:
+    """On-disk cache of fetched pages, keyed by a hash of the URL
+
+    Each page is stored as <key>.html with a <key>.json sidecar holding the
+    URL, fetch time and the ETag/Last-Modified validators. The body file's
+    mtime records when the page was last used, and the least recently used
+    pages are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(os.path.getsize(path) for path in self._body_files())
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.html', base + '.json'
+
+    def _body_files(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if name.endswith('.html')]
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path, text):
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def get(self, url, ttl=None):
+        """Return the cached body, or None if missing or older than ttl seconds
+
+        A ttl of None accepts a cached page of any age.
+        """
+        body_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        if meta is None or not os.path.exists(body_path):
+            return None
+        if ttl is not None and time.time() - meta['fetched_at'] > ttl:
+            return None
+        with open(body_path, encoding='utf-8') as f:
+            body = f.read()
+        os.utime(body_path)  # Mark as recently used
+        return body
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """Store a page body and its validators, evicting old pages if needed"""
+        body_path, meta_path = self._paths(url)
+        with self.lock:
+            old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            self._write(body_path, body)
+            self._write(meta_path, json.dumps({
+                'url': url,
+                'fetched_at': time.time(),
+                'etag': etag,
+                'last_modified': last_modified,
+            }))
+            self.total_bytes += os.path.getsize(body_path) - old_size
+            if self.total_bytes > self.max_bytes:
+                self._evict(keep=body_path)
+
+    def _evict(self, keep):
+        """Remove least recently used pages until the cache fits in max_bytes"""
+        for body_path in sorted(self._body_files(), key=os.path.getmtime):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if body_path == keep:
+                continue
+            self.total_bytes -= os.path.getsize(body_path)
+            os.remove(body_path)
+            meta_path = body_path[:-len('.html')] + '.json'
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+
+    def fetch(self, url, timeout=30):
+        """Fetch a page over HTTP and cache it, revalidating any cached copy
+
+        If the page is cached, its ETag/Last-Modified are sent so an unchanged
+        page costs a 304 instead of a full download.
+        """
+        body_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path) if os.path.exists(body_path) else None
+
+        request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+        if meta and meta.get('etag'):
+            request.add_header('If-None-Match', meta['etag'])
+        if meta and meta.get('last_modified'):
+            request.add_header('If-Modified-Since', meta['last_modified'])
+
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                charset = response.headers.get_content_charset() or 'utf-8'
+                body = response.read().decode(charset, errors='replace')
+                self.put(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                return body
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or meta is None:
+                raise
+            # Not modified: keep the body, restart its TTL
+            with open(body_path, encoding='utf-8') as f:
+                body = f.read()
+            self.put(url, body, meta.get('etag'), meta.get('last_modified'))
+            return body
@@ -0,0 +1,82 @@
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from rate_limiter import rate_limiter
+from scrape_metrics import new_page_stats
+from datetime import date
+import time
+
+# On-disk page cache shared by the scrapers. Pages of coaches whose careers
+# have ended never expire; the coaches list and active coaches are refetched
+# after PAGE_TTL.
+CACHE_DIR = 'page_cache'
+MAX_CACHE_MB = 500
+PAGE_TTL = 24 * 60 * 60
+
+# Page load waits: seconds to wait for the target table, and reload attempts
+PAGE_TIMEOUT = 15
+PAGE_RETRIES = 2
+RETRY_BACKOFF = 5
+
+# Pro-Football-Reference often puts tables in HTML comments. This unwraps
+# the table with id arguments[0] if needed and returns its markup (or null),
+# so one script call both checks for the table and extracts all its rows.
+TABLE_HTML_JS = """
+    var tableId = arguments[0];
+    var table = document.getElementById(tableId);
+    if (!table) {
+        var comments = document.evaluate('//comment()', document, null, XPathResult.ANY_TYPE, null);
+        var comment = comments.iterateNext();
+        while (comment) {
+            if (comment.nodeValue.indexOf('id="' + tableId + '"') !== -1) {
+                var div = document.createElement('div');
+                div.innerHTML = comment.nodeValue;
+                comment.parentNode.replaceChild(div, comment);
+                table = document.getElementById(tableId);
+                break;
+            }
+            comment = comments.iterateNext();
+        }
+    }
+    return table ? table.outerHTML : null;
+"""
+
+def load_page(driver, url, condition, stats=None):
+    """Load a page and wait until condition holds, retrying on timeout
+    
+    Every load waits for the shared rate limiter. Returns whatever the
+    condition returned (usually the awaited element). Fetch, render-wait
+    and sleep times and retries are added to stats.
+    """
+    if stats is None:
+        stats = new_page_stats()
+    for attempt in range(PAGE_RETRIES + 1):
+        stats['sleep'] += rate_limiter.wait(url)
+        start = time.perf_counter()
+        driver.get(url)
+        loaded = time.perf_counter()
+        stats['fetch'] += loaded - start
+        try:
+            result = WebDriverWait(driver, PAGE_TIMEOUT).until(condition)
+            stats['wait'] += time.perf_counter() - loaded
+            return result
+        except TimeoutException:
+            stats['wait'] += time.perf_counter() - loaded
+            if attempt == PAGE_RETRIES:
+                raise
+            print(f"Timed out loading {url}, retrying ({attempt + 1}/{PAGE_RETRIES})")
+            stats['retries'] += 1
+            time.sleep(RETRY_BACKOFF * (attempt + 1))
+            stats['sleep'] += RETRY_BACKOFF * (attempt + 1)
+
+def table_html(table_id):
+    """Wait condition returning the markup of a table once it is in the page"""
+    def condition(driver):
+        return driver.execute_script(TABLE_HTML_JS, table_id)
+    return condition
+
+def career_ttl(to_year):
+    """Cache lifetime for a coach page given its last season: forever once the career has ended"""
+    # A coach whose last season was last year may still be coaching
+    if to_year.isdigit() and int(to_year) < date.today().year - 1:
+        return None
+    return PAGE_TTL
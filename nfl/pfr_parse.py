@@ -0,0 +1,154 @@
+import re
+from collections import namedtuple
+from html import unescape
+from urllib.parse import urljoin
+
+# One table cell: its visible text and the href of its first link (or None)
+Cell = namedtuple('Cell', ['text', 'href'])
+
+# Pro-Football-Reference tables are machine-generated and regular, so a few
+# regular expressions are enough and far cheaper than a general HTML parser
+ROW_RE = re.compile(r'<tr\b([^>]*)>(.*?)</tr>', re.S)
+CELL_RE = re.compile(r'<(th|td)\b([^>]*)>(.*?)</\1>', re.S)
+STAT_RE = re.compile(r'data-stat="([^"]*)"')
+CLASS_RE = re.compile(r'class="([^"]*)"')
+HREF_RE = re.compile(r'<a\b[^>]*?href="([^"]*)"')
+TAG_RE = re.compile(r'<[^>]+>')
+H1_RE = re.compile(r'<h1\b[^>]*>(.*?)</h1>', re.S)
+
+def find_table_html(html, table_id):
+    """Return the markup of the table with the given id, or None
+
+    Works on the raw page text, so tables hidden inside HTML comments
+    are found the same way as visible ones.
+    """
+    marker = html.find(f'id="{table_id}"')
+    if marker == -1:
+        return None
+    start = html.rfind('<table', 0, marker)
+    end = html.find('</table>', marker)
+    if start == -1 or end == -1:
+        return None
+    return html[start:end + len('</table>')]
+
+def parse_rows(table_html):
+    """Split table markup into body rows of {data-stat: Cell} dicts"""
+    # Column headers live in <thead>; only the rows after it are data
+    thead_end = table_html.find('</thead>')
+    if thead_end != -1:
+        table_html = table_html[thead_end:]
+
+    rows = []
+    for row_attrs, row_html in ROW_RE.findall(table_html):
+        # Repeated header rows inside the body are marked with class="thead"
+        row_class = CLASS_RE.search(row_attrs)
+        if row_class and 'thead' in row_class.group(1).split():
+            continue
+        row = {}
+        for _, cell_attrs, cell_html in CELL_RE.findall(row_html):
+            stat = STAT_RE.search(cell_attrs)
+            if not stat:
+                continue
+            href = HREF_RE.search(cell_html)
+            text = unescape(TAG_RE.sub('', cell_html)).strip()
+            row[stat.group(1)] = Cell(text, unescape(href.group(1)) if href else None)
+        if row:
+            rows.append(row)
+    return rows
+
+def parse_table_text(html, table_id):
+    """Parse a table into its column headers and the text of each body row
+
+    Headers come from the last header row (the one under any "Playoffs"
+    style over-headers), matching the table's own CSV export.
+    """
+    table_html = find_table_html(html, table_id)
+    if table_html is None:
+        return [], []
+    head, _, body = table_html.partition('</thead>')
+    header_rows = ROW_RE.findall(head)
+    header = []
+    if header_rows:
+        header = [unescape(TAG_RE.sub('', cell_html)).strip()
+                  for _, _, cell_html in CELL_RE.findall(header_rows[-1][1])]
+
+    rows = []
+    for row_attrs, row_html in ROW_RE.findall(body):
+        row_class = CLASS_RE.search(row_attrs)
+        if row_class and 'thead' in row_class.group(1).split():
+            continue
+        rows.append([unescape(TAG_RE.sub('', cell_html)).strip()
+                     for _, _, cell_html in CELL_RE.findall(row_html)])
+    return header, rows
+
+def parse_heading(html):
+    """Text of the page's <h1>, e.g. the coach's name on a coach page"""
+    match = H1_RE.search(html)
+    return unescape(TAG_RE.sub('', match.group(1))).strip() if match else ''
+
+def parse_table(html, table_id):
+    """Parse the table with the given id into a list of {data-stat: Cell} rows"""
+    table_html = find_table_html(html, table_id)
+    if table_html is None:
+        return []
+    return parse_rows(table_html)
+
+def cell_text(row, stat):
+    """Text of a row's cell, or '' if the row has no such column"""
+    cell = row.get(stat)
+    return cell.text if cell else ''
+
+def parse_coaches_list(html, base_url):
+    """Extract the coaches table from the coaches index page"""
+    coaches = []
+    for row in parse_table(html, 'coaches'):
+        name = row.get('coach')
+        if not name or not name.text or not name.href:
+            continue
+        coaches.append({
+            # Hall of Famers are marked with a trailing '+'
+            'name': name.text.rstrip('+').strip(),
+            'url': urljoin(base_url, name.href),
+            'yrs': cell_text(row, 'seasons'),
+            'from': cell_text(row, 'year_min'),
+            'to': cell_text(row, 'year_max'),
+            'g': cell_text(row, 'g'),
+            'w': cell_text(row, 'wins'),
+            'l': cell_text(row, 'losses'),
+            't': cell_text(row, 'ties')
+        })
+    return coaches
+
+def team_code(cell):
+    """Team abbreviation from a team cell, using the link like /teams/chi/2024.htm"""
+    if cell.href and '/teams/' in cell.href:
+        return cell.href.split('/teams/')[1].split('/')[0].upper()
+    return cell.text
+
+def parse_coaching_record(html):
+    """Extract (team_code, year) pairs from a coach page's coaching_record table"""
+    career_data = []
+    for row in parse_table(html, 'coaching_record'):
+        year = row.get('year')
+        team = row.get('team')
+        if not year or not team:
+            continue
+        code = team_code(team)
+        # Skip empty or summary rows
+        if year.text.isdigit() and code:
+            career_data.append((code, year.text))
+    return career_data
+
+if __name__ == "__main__":
+    import time
+
+    with open('debug_page.html', encoding='utf-8') as f:
+        page = f.read()
+
+    start = time.perf_counter()
+    coaches = parse_coaches_list(page, 'https://www.pro-football-reference.com/coaches/')
+    elapsed = time.perf_counter() - start
+
+    print(f"Parsed {len(coaches)} coaches in {elapsed * 1000:.1f} ms")
+    for coach in coaches[:5]:
+        print(coach)
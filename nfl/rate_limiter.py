@@ -0,0 +1,33 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+# Politeness budget shared by all drivers, per host
+# (Sports Reference asks for no more than 20 requests a minute)
+REQUESTS_PER_SECOND = 20 / 60
+
+class RateLimiter:
+    """Spread requests to each host at most requests_per_second apart"""
+    
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second
+        self.next_slot = {}
+        self.lock = threading.Lock()
+    
+    def wait(self, url):
+        """Block until the next request slot for the URL's host
+        
+        Returns the number of seconds spent sleeping.
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+            return slot - now
+        return 0.0
+
+# Shared by every scraper in the process
+rate_limiter = RateLimiter(REQUESTS_PER_SECOND)
@@ -0,0 +1,91 @@
+import json
+import math
+import threading
+import time
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def new_page_stats():
+    """Per-request timings filled in while a page is fetched and parsed"""
+    return {
+        'fetch': 0.0,  # driver.get / HTTP download
+        'wait': 0.0,  # waiting for the target table to render
+        'sleep': 0.0,  # rate limiting and retry backoff
+        'parse': 0.0,
+        'retries': 0,
+        'cached': False,
+        'failed': False,
+    }
+
+class ScrapeMetrics:
+    """Collect per-request scrape metrics and summarise a run
+
+    Every recorded request is also appended to a JSON-lines file so long
+    runs can be analysed afterwards. The file is emptied first unless append
+    is set, e.g. when resuming a run.
+    """
+
+    def __init__(self, metrics_file=None, append=False):
+        self.metrics_file = metrics_file
+        self.records = []
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        if metrics_file and not append:
+            open(metrics_file, 'w').close()
+
+    def record(self, page, url, stats, rows):
+        """Record one page request; page is 'coaches_list' or 'coach_career'"""
+        # Latency is the working time; sleeping is reported separately
+        entry = dict(stats, page=page, url=url, rows=rows,
+                     latency=stats['fetch'] + stats['wait'] + stats['parse'])
+        with self.lock:
+            self.records.append(entry)
+            if self.metrics_file:
+                with open(self.metrics_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+
+    def summary(self):
+        """Return run totals: latency percentiles, throughput and time split"""
+        with self.lock:
+            records = list(self.records)
+        elapsed = time.perf_counter() - self.started
+        latencies = [r['latency'] for r in records if not r['cached'] and not r['failed']]
+
+        def total(key):
+            return sum(r[key] for r in records)
+
+        return {
+            'pages': len(records),
+            'cached': sum(1 for r in records if r['cached']),
+            'failed': sum(1 for r in records if r['failed']),
+            'rows': total('rows'),
+            'retries': total('retries'),
+            'elapsed': elapsed,
+            'pages_per_min': len(records) / elapsed * 60 if elapsed else 0.0,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'fetch': total('fetch'),
+            'wait': total('wait'),
+            'parse': total('parse'),
+            'sleep': total('sleep'),
+        }
+
+    def print_summary(self):
+        """Print the run summary"""
+        s = self.summary()
+        working = s['fetch'] + s['wait'] + s['parse']
+        print("\n=== Scrape Summary ===")
+        print(f"Pages: {s['pages']} ({s['cached']} from cache, {s['failed']} failed), "
+              f"rows: {s['rows']}, retries: {s['retries']}")
+        print(f"Elapsed: {s['elapsed']:.1f}s, {s['pages_per_min']:.1f} pages/min")
+        print(f"Latency (network pages): p50 {s['p50']:.2f}s, p95 {s['p95']:.2f}s")
+        print(f"Time across workers: fetch {s['fetch']:.1f}s, render wait {s['wait']:.1f}s, "
+              f"parse {s['parse']:.1f}s, sleeping {s['sleep']:.1f}s")
+        if working + s['sleep']:
+            print(f"Sleeping vs working: {s['sleep'] / (working + s['sleep']):.0%} sleeping")